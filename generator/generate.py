@@ -1,60 +1,200 @@
+import asyncio
+import concurrent.futures
 import csv
+import functools
+import hashlib
+import html
+import io
+import json
 import os
-import re
+import socket
+import threading
 import datetime as dt
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator
 from urllib.parse import urlparse
+from xml.sax.saxutils import escape as xml_escape
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import secrets
-import string
+
+try:
+    import aiohttp
+except ImportError:  # health checks fall back to the sync head_check
+    aiohttp = None  # type: ignore[assignment]
 
 TIMEOUT = float(os.environ.get("TIMEOUT", "12"))
+CONNECT_TIMEOUT = float(os.environ.get("CONNECT_TIMEOUT", "3"))
+MAX_REDIRECTS = 3
+HEAD_CONCURRENCY = max(1, int(os.environ.get("HEAD_CONCURRENCY", "50")))
+# After this many timed-out HEADs, remaining URLs on the same host are skipped
+HOST_TIMEOUT_LIMIT = 3
 DATA_FILE = os.environ.get("DATA_FILE", "data/daily.csv")
 DOCS_DIR = os.environ.get("DOCS_DIR", "docs")
 BASE_URL = os.environ.get("BASE_URL", "https://USERNAME.github.io/REPO").rstrip("/")
 MAX_PER_PAGE = int(os.environ.get("MAX_PER_PAGE", "10"))
 DAYS_ON_INDEX = int(os.environ.get("DAYS_ON_INDEX", "30"))
 
+# Set FORCE_REBUILD=1 to ignore docs/.build_state.json and regenerate every day
+FORCE_REBUILD = os.environ.get("FORCE_REBUILD", "").strip() == "1"
+BUILD_STATE_FILE = os.path.join(DOCS_DIR, ".build_state.json")
+# Part of every content digest: bump it whenever a template, escaping rule or
+# health CSV column changes so pages already on disk are rendered again
+RENDER_VERSION = 1
+DAILY_DIR = os.path.join(DOCS_DIR, "d")
+HEALTH_DIR = os.path.join(DOCS_DIR, "health")
+# HTTP responses and permanent failures are reused across runs for this many days;
+# timeouts, connection errors and skipped hosts are re-checked on the next build
+HEALTH_TTL_DAYS = int(os.environ.get("HEALTH_TTL_DAYS", "14"))
+
 # Optional: newline-separated URLs injected at runtime (workflow_dispatch)
 EXTRA_URLS = os.environ.get("EXTRA_URLS", "").strip()
 
 UA = {"User-Agent": "Mozilla/5.0 (compatible; DiscoveryHub/1.0)"}
 
-URL_RE = re.compile(r"^https?://", re.I)
+# Process-local DNS cache: hub URLs share a handful of hosts, so resolve each once per run
+_system_getaddrinfo = socket.getaddrinfo
+
+@functools.lru_cache(maxsize=1024)
+def _getaddrinfo_memo(host, port, family=0, type=0, proto=0, flags=0):
+    return tuple(_system_getaddrinfo(host, port, family, type, proto, flags))
+
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    return list(_getaddrinfo_memo(host, port, family, type, proto, flags))
+
+socket.getaddrinfo = _cached_getaddrinfo
+
+# Shared keep-alive pool for every sync HTTP call
+SESSION = requests.Session()
+SESSION.headers.update(UA)
+_adapter = HTTPAdapter(pool_connections=20, pool_maxsize=100, max_retries=Retry(total=1, read=False, backoff_factor=0.2))
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+SESSION.max_redirects = MAX_REDIRECTS
+
+# Case-insensitive scheme check: url[:8].lower().startswith(_SCHEMES)
+_SCHEMES = ("http://", "https://")
 
 def safe_mkdir(p: str) -> None:
     os.makedirs(p, exist_ok=True)
 
-def read_daily_csv(path: str):
-    rows = []
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+def write_file(path: str, body: str) -> None:
+    # Whole body is already in memory: hand it to the kernel directly, no io buffer layer
+    data = memoryview(body.encode("utf-8"))
+    fd = os.open(path, _WRITE_FLAGS, 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+def write_chunks(path: str, chunks: Iterable[str]) -> None:
+    # Large buffer so many small chunks coalesce into few write() syscalls
+    with open(path, "wb", buffering=1 << 20) as f:
+        f.writelines(chunk.encode("utf-8") for chunk in chunks)
+
+def load_build_state(path: str) -> dict:
+    if FORCE_REBUILD or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "rb") as f:
+            state = orjson.loads(f.read())
+        return state if isinstance(state, dict) else {}
+    except Exception:
+        return {}
+
+def save_build_state(path: str, state: dict) -> None:
+    # Write-then-rename so an interrupted run never leaves a truncated state file
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps(state, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+    os.replace(tmp, path)
+
+def content_digest(*inputs) -> str:
+    # sha1 over BASE_URL, RENDER_VERSION and whatever a page is rendered from (timestamps excluded)
+    payload = json.dumps([BASE_URL, RENDER_VERSION, *inputs], separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def output_is_current(name: str, digest: str, prev_digests: dict) -> bool:
+    return prev_digests.get(name) == digest and os.path.exists(os.path.join(DOCS_DIR, name))
+
+def health_is_fresh(checked_utc: str, now: dt.datetime) -> bool:
+    try:
+        ts = dt.datetime.strptime(checked_utc, "%Y-%m-%d %H:%M:%S").replace(tzinfo=dt.timezone.utc)
+    except (TypeError, ValueError):
+        return False
+    return (now - ts).days < HEALTH_TTL_DAYS
+
+# Failures that would come back the same on a retry
+_PERMANENT_ERRORS = frozenset({"error:TooManyRedirects", "error:InvalidURL"})
+
+def health_is_cacheable(result) -> bool:
+    status, _, xrobots = result[:3]
+    return status != "" or xrobots in _PERMANENT_ERRORS
+
+@functools.lru_cache(maxsize=None)
+def escape_url(u: str) -> str:
+    # The same URL is rendered on several days and on all.html; escape it once per run
+    return html.escape(u, quote=True)
+
+def read_daily_csv(path: str) -> list[tuple[str, str]]:
+    """
+    daily.csv is plain `date,url` lines, so stream it in binary and split by hand instead of
+    running csv.reader; only lines with quotes go through the csv module.
+    """
+    rows: list[tuple[str, str]] = []
     if not os.path.exists(path):
         return rows
-    with open(path, "r", encoding="utf-8") as f:
-        r = csv.reader(f)
-        for line in r:
-            if not line or len(line) < 2:
-                continue
-            date_s = (line[0] or "").strip()
-            url = (line[1] or "").strip()
+    append = rows.append
+    with open(path, "rb") as f:
+        for raw in f:
+            if b'"' in raw:
+                parts = next(csv.reader([raw.decode("utf-8")]), [])
+                if len(parts) < 2:
+                    continue
+                date_s = (parts[0] or "").strip()
+                url = (parts[1] or "").strip()
+            else:
+                fields = raw.split(b",", 2)
+                if len(fields) < 2:
+                    continue
+                date_s = fields[0].strip().decode("utf-8")
+                url = fields[1].strip().decode("utf-8")
             if not date_s or not url:
                 continue
-            if not URL_RE.match(url):
+            if not url[:8].lower().startswith(_SCHEMES):
                 continue
-            rows.append((date_s, url))
+            append((date_s, url))
     return rows
 
-def parse_extra_urls(extra: str):
-    urls = []
+def parse_extra_urls(extra: str) -> list[str]:
+    urls: list[str] = []
     if not extra:
         return urls
     for line in extra.splitlines():
         u = line.strip()
         if not u:
             continue
-        if not URL_RE.match(u):
+        if not u[:8].lower().startswith(_SCHEMES):
             continue
         urls.append(u)
     return urls
 
+_host_timeouts: Counter[str] = Counter()
+
+def _host_blocked(url: str) -> bool:
+    return _host_timeouts[urlparse(url).netloc] >= HOST_TIMEOUT_LIMIT
+
+def _note_timeout(url: str) -> None:
+    _host_timeouts[urlparse(url).netloc] += 1
+
+_SKIPPED = ("", "", "error:HostTimeouts", False)
+
+@functools.lru_cache(maxsize=None)
 def head_check(url: str):
     """
     Quick HTTP HEAD check:
@@ -62,31 +202,106 @@ def head_check(url: str):
     - final URL after redirects
     - X-Robots-Tag header (noindex hints)
     """
+    if _host_blocked(url):
+        return _SKIPPED
     try:
-        r = requests.head(url, allow_redirects=True, timeout=TIMEOUT, headers=UA)
+        r = SESSION.head(url, allow_redirects=True, timeout=(CONNECT_TIMEOUT, TIMEOUT))
         status = r.status_code
         final_url = r.url
         xrobots = r.headers.get("X-Robots-Tag", "")
         noindex = "noindex" in (xrobots or "").lower()
         return status, final_url, xrobots, noindex
     except Exception as e:
+        if isinstance(e, requests.Timeout):
+            _note_timeout(url)
         return "", "", f"error:{type(e).__name__}", False
 
-def build_index_page(dates_sorted, latest_date):
-    updated = dt.datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
-    latest_link = f'<p><a href="{BASE_URL}/d/{latest_date}.html">Open latest: {latest_date}</a></p>' if latest_date else ""
-    recent = list(reversed(dates_sorted[-DAYS_ON_INDEX:]))
-    days_html = "\n".join([f'<li><a href="{BASE_URL}/d/{d}.html">{d}</a></li>' for d in recent]) if recent else "<li>No data yet</li>"
-    return f"""<!doctype html>
+def _aiohttp_error_name(e: Exception) -> str:
+    # Report aiohttp failures under the requests exception names head_check uses,
+    # so the health CSVs and cached state don't depend on which path ran
+    if isinstance(e, aiohttp.ConnectionTimeoutError):  # added in aiohttp 3.10
+        return "ConnectTimeout"
+    if isinstance(e, asyncio.TimeoutError):
+        return "ReadTimeout"
+    if isinstance(e, aiohttp.TooManyRedirects):
+        return "TooManyRedirects"
+    if isinstance(e, aiohttp.InvalidURL):
+        return "InvalidURL"
+    if isinstance(e, aiohttp.ClientConnectionError):
+        return "ConnectionError"
+    return type(e).__name__
+
+async def head_check_async(session, url: str):
+    """
+    Async twin of head_check, returning the same 4-tuple.
+    """
+    if _host_blocked(url):
+        return _SKIPPED
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT, sock_connect=CONNECT_TIMEOUT)
+    try:
+        async with session.head(url, allow_redirects=True, max_redirects=MAX_REDIRECTS, timeout=timeout) as r:
+            xrobots = r.headers.get("X-Robots-Tag", "")
+            noindex = "noindex" in (xrobots or "").lower()
+            final_url = str(r.url)
+            # aiohttp drops the fragment; requests carries it through redirects
+            _, sep, fragment = url.partition("#")
+            if sep and "#" not in final_url:
+                final_url = f"{final_url}#{fragment}"
+            return r.status, final_url, xrobots, noindex
+    except Exception as e:
+        if isinstance(e, asyncio.TimeoutError):
+            _note_timeout(url)
+        return "", "", f"error:{_aiohttp_error_name(e)}", False
+
+async def _gather(urls):
+    sem = asyncio.Semaphore(HEAD_CONCURRENCY)
+    host_sems: defaultdict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(1))
+    connector = aiohttp.TCPConnector(limit=HEAD_CONCURRENCY, use_dns_cache=True, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(headers=UA, connector=connector) as session:
+        async def bounded(url):
+            host = urlparse(url).netloc
+            async with sem:
+                if not _host_timeouts[host]:
+                    return await head_check_async(session, url)
+            # The host has timed out before: probe it one request at a time, so its
+            # queued URLs are skipped as soon as it reaches HOST_TIMEOUT_LIMIT
+            async with host_sems[host], sem:
+                return await head_check_async(session, url)
+        results = await asyncio.gather(*(bounded(u) for u in urls))
+    return dict(zip(urls, results))
+
+def run_health_checks(urls):
+    """
+    HEAD-check every unique URL concurrently; returns {url: head_check tuple}.
+    Falls back to serial (memoized) head_check when aiohttp is not installed.
+    """
+    if not urls:
+        return {}
+    if aiohttp is None:
+        return {u: head_check(u) for u in urls}
+    return asyncio.run(_gather(urls))
+
+# Everything in <head> except the title is identical across pages
+_HEAD_OPEN = """<!doctype html>
 <html lang="en">
 <head>
   <meta charset="utf-8">
-  <title>Backlink Discovery Hub</title>
+  <title>"""
+_HEAD_CLOSE = """</title>
   <meta name="robots" content="index,follow">
   <meta name="viewport" content="width=device-width,initial-scale=1">
 </head>
 <body>
-  <h1>Backlink Discovery Hub</h1>
+"""
+
+def common_head(title: str) -> str:
+    return f"{_HEAD_OPEN}{title}{_HEAD_CLOSE}"
+
+def build_index_page(dates_sorted: list[str], latest_date: str, updated: str) -> str:
+    latest_link = f'<p><a href="{BASE_URL}/d/{latest_date}.html">Open latest: {latest_date}</a></p>' if latest_date else ""
+    recent = list(reversed(dates_sorted[-DAYS_ON_INDEX:]))
+    days_html = "\n".join([f'<li><a href="{BASE_URL}/d/{d}.html">{d}</a></li>' for d in recent]) if recent else "<li>No data yet</li>"
+    return f"""{common_head("Backlink Discovery Hub")}  <h1>Backlink Discovery Hub</h1>
   <p>Updated: {updated}</p>
   {latest_link}
   <p><a href="{BASE_URL}/all.html">All recent links</a> | <a href="{BASE_URL}/backlink-feed.xml">Atom feed</a> | <a href="{BASE_URL}/sitemap.xml">Sitemap</a></p>
@@ -97,94 +312,109 @@ def build_index_page(dates_sorted, latest_date):
 </body>
 </html>"""
 
-def build_daily_page(date_s, urls):
-    updated = dt.datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
-    items = []
-    for u in urls:
-        items.append(f'<li><a href="{u}" target="_blank" rel="noopener">{u}</a><br><small>Reference link discovered on {date_s}.</small></li>')
-    return f"""<!doctype html>
-<html lang="en">
-<head>
-  <meta charset="utf-8">
-  <title>Daily Discovery {date_s}</title>
-  <meta name="robots" content="index,follow">
-  <meta name="viewport" content="width=device-width,initial-scale=1">
-</head>
-<body>
-  <p><a href="{BASE_URL}/">Hub</a> | <a href="{BASE_URL}/all.html">All</a> | <a href="{BASE_URL}/backlink-feed.xml">Feed</a></p>
+def build_daily_page(date_s: str, urls: list[str], updated: str) -> str:
+    # urls arrive already HTML-escaped
+    items_html = "".join(f'<li><a href="{u}" target="_blank" rel="noopener">{u}</a><br><small>Reference link discovered on {date_s}.</small></li>' for u in urls)
+    return f"""{common_head(f"Daily Discovery {date_s}")}  <p><a href="{BASE_URL}/">Hub</a> | <a href="{BASE_URL}/all.html">All</a> | <a href="{BASE_URL}/backlink-feed.xml">Feed</a></p>
   <h1>Daily Discovery: {date_s}</h1>
   <p>Updated: {updated}</p>
   <ol>
-    {"".join(items) if items else "<li>No links</li>"}
+    {items_html or "<li>No links</li>"}
   </ol>
 </body>
 </html>"""
 
-def build_all_page(unique_urls):
-    updated = dt.datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
-    items = "\n".join([f'<li><a href="{u}" target="_blank" rel="noopener">{u}</a></li>' for u in unique_urls[:500]])
-    plain = "\n".join(unique_urls[:500])
-    return f"""<!doctype html>
-<html lang="en">
-<head>
-  <meta charset="utf-8">
-  <title>All Recent Links</title>
-  <meta name="robots" content="index,follow">
-  <meta name="viewport" content="width=device-width,initial-scale=1">
-</head>
-<body>
-  <p><a href="{BASE_URL}/">Hub</a> | <a href="{BASE_URL}/backlink-feed.xml">Feed</a></p>
+def iter_all_page(unique_urls: list[str], updated: str) -> Iterator[str]:
+    # unique_urls arrive already HTML-escaped and capped at 500; yields the page in chunks
+    yield f"""{common_head("All Recent Links")}  <p><a href="{BASE_URL}/">Hub</a> | <a href="{BASE_URL}/backlink-feed.xml">Feed</a></p>
   <h1>All Recent Links</h1>
   <p>Updated: {updated}</p>
   <ul>
-    {items if items else "<li>No links</li>"}
+    """
+    sep = ""
+    for u in unique_urls:
+        yield f'{sep}<li><a href="{u}" target="_blank" rel="noopener">{u}</a></li>'
+        sep = "\n"
+    if not unique_urls:
+        yield "<li>No links</li>"
+    yield """
   </ul>
   <h2>Plain list</h2>
-  <pre>{plain}</pre>
+  <pre>"""
+    sep = ""
+    for u in unique_urls:
+        yield f"{sep}{u}"
+        sep = "\n"
+    yield """</pre>
 </body>
 </html>"""
 
-def build_atom_feed(latest_urls):
-    now = dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+_XML_ATTR = {'"': "&quot;"}
+
+def _netloc_path(u: str) -> tuple[str, str]:
+    """
+    (netloc, path) as urlparse would return them, via str.find instead of a full parse.
+    """
+    i = u.find("://")
+    rest = u[i + 3:] if i >= 0 else u
+    end = len(rest)
+    for ch in "?#":
+        k = rest.find(ch)
+        if 0 <= k < end:
+            end = k
+    rest = rest[:end]
+    j = rest.find("/")
+    if j < 0:
+        return rest, ""
+    netloc, path = rest[:j], rest[j:]
+    # urlparse moves ";params" on the last segment out of path
+    k = path.find(";", path.rfind("/"))
+    return netloc, path[:k] if k >= 0 else path
+
+def iter_atom_feed(parsed_urls: list[tuple[str, tuple[str, str]]], now: str) -> Iterator[str]:
+    # parsed_urls are (url, _netloc_path(url)) pairs, capped at 100; yields the feed in chunks
     feed_id = f"{BASE_URL}/backlink-feed.xml"
-    entries = []
-    for u in latest_urls[:100]:
-        pu = urlparse(u)
-        eid = f"urn:link:{pu.netloc}{pu.path}"
-        entries.append(f"""
-  <entry>
-    <title>{u}</title>
-    <id>{eid}</id>
-    <link href="{u}" />
-    <updated>{now}</updated>
-  </entry>""".rstrip())
-    return f"""<?xml version="1.0" encoding="utf-8"?>
+    yield f"""<?xml version="1.0" encoding="utf-8"?>
 <feed xmlns="http://www.w3.org/2005/Atom">
   <title>Backlink Discovery Feed</title>
   <id>{feed_id}</id>
   <updated>{now}</updated>
   <link rel="self" href="{feed_id}" />
-{''.join(entries)}
+"""
+    for u, (netloc, path) in parsed_urls:
+        yield f"""
+  <entry>
+    <title>{xml_escape(u)}</title>
+    <id>{xml_escape(f"urn:link:{netloc}{path}")}</id>
+    <link href="{xml_escape(u, _XML_ATTR)}" />
+    <updated>{now}</updated>
+  </entry>"""
+    yield """
 </feed>
 """
 
-def build_sitemap(dates_sorted):
-    now = dt.datetime.utcnow().date().isoformat()
-    urls = [f"{BASE_URL}/", f"{BASE_URL}/all.html", f"{BASE_URL}/backlink-feed.xml"] + [f"{BASE_URL}/d/{d}.html" for d in dates_sorted[-365:]]
-    items = "\n".join([f"<url><loc>{u}</loc><lastmod>{now}</lastmod></url>" for u in urls])
-    return f"""<?xml version="1.0" encoding="UTF-8"?>
+def iter_sitemap(dates_sorted: list[str], now: str) -> Iterator[str]:
+    # dates_sorted arrives capped at the last 365 days; yields the sitemap in chunks
+    prefix = f"{BASE_URL}/d/"
+    tail = f"</loc><lastmod>{now}</lastmod></url>\n"
+    yield """<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-{items}
-</urlset>
+"""
+    for u in (f"{BASE_URL}/", f"{BASE_URL}/all.html", f"{BASE_URL}/backlink-feed.xml"):
+        yield f"<url><loc>{u}{tail}"
+    for d in dates_sorted:
+        yield f"<url><loc>{prefix}{d}.html{tail}"
+    yield """</urlset>
 """
 
-def build_robots():
+def build_robots() -> str:
     return f"User-agent: *\nAllow: /\nSitemap: {BASE_URL}/sitemap.xml\n"
 
 # =========================
 # Broadcast features
 # =========================
 
+@functools.lru_cache(maxsize=4)
 def _find_existing_indexnow_key(docs_dir: str) -> str:
     try:
         for fn in os.listdir(docs_dir):
@@ -206,29 +436,61 @@ def _find_existing_indexnow_key(docs_dir: str) -> str:
     return ""
 
 def _generate_indexnow_key(length: int = 32) -> str:
-    alphabet = string.ascii_letters + string.digits
-    return "".join(secrets.choice(alphabet) for _ in range(length))
+    # Hex stays inside IndexNow's [A-Za-z0-9-] key alphabet; token_urlsafe may emit "_"
+    return secrets.token_hex(length // 2)
+
+# Resolved once per process by ensure_indexnow_key_file
+_INDEXNOW_KEY = ""
+
+# IndexNow accepts at most 10,000 URLs per POST
+INDEXNOW_MAX_URLS = 10000
+
+# Remembers the resolved key so later runs skip scanning every .txt in docs/
+INDEXNOW_KEY_STATE = ".indexnow_key"
+
+def _read_indexnow_key_state(docs_dir: str) -> str:
+    try:
+        with open(os.path.join(docs_dir, INDEXNOW_KEY_STATE), "r", encoding="utf-8") as f:
+            key = (f.readline() or "").strip()
+    except OSError:
+        return ""
+    # Only trust it while the published key file is still there
+    if key and os.path.exists(os.path.join(docs_dir, f"{key}.txt")):
+        return key
+    return ""
 
 def ensure_indexnow_key_file(docs_dir: str, base_url: str):
+    global _INDEXNOW_KEY
+    if _INDEXNOW_KEY:
+        return _INDEXNOW_KEY, f"{base_url}/{_INDEXNOW_KEY}.txt"
     key = os.environ.get("INDEXNOW_KEY", "").strip()
     if not key:
-        key = _find_existing_indexnow_key(docs_dir)
+        key = _read_indexnow_key_state(docs_dir)
     if not key:
-        key = _generate_indexnow_key()
-        key_file = os.path.join(docs_dir, f"{key}.txt")
-        with open(key_file, "w", encoding="utf-8") as f:
-            f.write(key)
+        key = _find_existing_indexnow_key(docs_dir)
+        if not key:
+            key = _generate_indexnow_key()
+            key_file = os.path.join(docs_dir, f"{key}.txt")
+            write_file(key_file, key)
+            # The memoized scan of docs_dir predates this file
+            _find_existing_indexnow_key.cache_clear()
+        write_file(os.path.join(docs_dir, INDEXNOW_KEY_STATE), key)
+    _INDEXNOW_KEY = key
     key_location = f"{base_url}/{key}.txt"
     return key, key_location
 
-def broadcast_indexnow(url_to_submit: str, docs_dir: str, base_url: str) -> None:
+def broadcast_indexnow(url_list, docs_dir: str, base_url: str) -> None:
+    if not url_list:
+        return
     try:
         key, key_location = ensure_indexnow_key_file(docs_dir, base_url)
         host = urlparse(base_url).netloc
-        payload = {"host": host, "key": key, "keyLocation": key_location, "urlList": [url_to_submit]}
+        url_list = list(url_list)[:INDEXNOW_MAX_URLS]
+        payload = {"host": host, "key": key, "keyLocation": key_location, "urlList": url_list}
         endpoint = os.environ.get("INDEXNOW_ENDPOINT", "https://api.indexnow.org/indexnow")
-        r = requests.post(endpoint, json=payload, timeout=TIMEOUT, headers=UA)
-        print(f"[IndexNow] {r.status_code} submit={url_to_submit}")
+        headers = {"Content-Type": "application/json"}
+        r = SESSION.post(endpoint, data=orjson.dumps(payload), headers=headers, timeout=TIMEOUT)
+        print(f"[IndexNow] {r.status_code} submit={len(url_list)} urls")
     except Exception as e:
         print(f"[IndexNow] error: {type(e).__name__}")
 
@@ -245,72 +507,156 @@ def broadcast_pingomatic(feed_url: str) -> None:
 </methodCall>
 """
         headers = {"Content-Type": "text/xml"}
-        r = requests.post(endpoint, data=xml.encode("utf-8"), headers=headers, timeout=TIMEOUT)
+        r = SESSION.post(endpoint, data=xml.encode("utf-8"), headers=headers, timeout=TIMEOUT)
         print(f"[Ping-O-Matic] {r.status_code} feed={feed_url}")
     except Exception as e:
         print(f"[Ping-O-Matic] error: {type(e).__name__}")
 
+HEALTH_HEADER = ["date", "input_url", "status", "final_url", "x_robots_tag", "noindex_hint"]
+
+def render_day(date_s: str, urls: list[str], health: dict, updated: str) -> tuple[str, list[list]]:
+    """
+    Pure per-day step: returns (daily page HTML, health CSV rows) without touching disk or network.
+    """
+    safe_urls = [escape_url(u) for u in urls]
+    health_rows = []
+    for u in urls:
+        status, final_url, xrobots, noindex = health[u]
+        health_rows.append([date_s, u, status, final_url, xrobots, "yes" if noindex else ""])
+    return build_daily_page(date_s, safe_urls, updated), health_rows
+
+def _write_day(date_s: str, urls: list[str], health: dict, updated: str) -> None:
+    page, health_rows = render_day(date_s, urls, health, updated)
+    write_file(f"{DAILY_DIR}/{date_s}.html", page)
+    sio = io.StringIO()
+    w = csv.writer(sio)
+    w.writerow(HEALTH_HEADER)
+    w.writerows(health_rows)
+    write_file(f"{HEALTH_DIR}/{date_s}.csv", sio.getvalue())
+
 def main():
     rows = read_daily_csv(DATA_FILE)
-    by_date = {}
+    by_date = defaultdict(list)
     for date_s, url in rows:
-        by_date.setdefault(date_s, []).append(url)
+        by_date[date_s].append(url)
 
-    today = dt.datetime.utcnow().date().isoformat()
+    # One clock read per run, shared by every builder
+    now = dt.datetime.now(dt.timezone.utc).replace(microsecond=0)
+    updated = now.strftime("%Y-%m-%d %H:%M UTC")
+    updated_iso = now.isoformat().replace("+00:00", "Z")
+    today = now.date().isoformat()
 
     extra = parse_extra_urls(EXTRA_URLS)
     if extra:
-        by_date.setdefault(today, []).extend(extra)
+        by_date[today].extend(extra)
 
     dates_sorted = sorted(by_date.keys())
     latest_date = dates_sorted[-1] if dates_sorted else ""
 
     safe_mkdir(DOCS_DIR)
-    safe_mkdir(os.path.join(DOCS_DIR, "d"))
-    safe_mkdir(os.path.join(DOCS_DIR, "health"))
+    safe_mkdir(DAILY_DIR)
+    safe_mkdir(HEALTH_DIR)
 
-    unique_recent = []
+    seen = {}
     for d in reversed(dates_sorted[-DAYS_ON_INDEX:]):
-        for u in by_date.get(d, []):
-            if u not in unique_recent:
-                unique_recent.append(u)
-
-    for d in dates_sorted[-365:]:
-        urls = by_date.get(d, [])[:MAX_PER_PAGE]
-        with open(os.path.join(DOCS_DIR, "d", f"{d}.html"), "w", encoding="utf-8") as f:
-            f.write(build_daily_page(d, urls))
-
-        health_path = os.path.join(DOCS_DIR, "health", f"{d}.csv")
-        with open(health_path, "w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(["date", "input_url", "status", "final_url", "x_robots_tag", "noindex_hint"])
-            for u in urls:
-                status, final_url, xrobots, noindex = head_check(u)
-                w.writerow([d, u, status, final_url, xrobots, "yes" if noindex else ""])
-
-    with open(os.path.join(DOCS_DIR, "index.html"), "w", encoding="utf-8") as f:
-        f.write(build_index_page(dates_sorted, latest_date))
-
-    with open(os.path.join(DOCS_DIR, "all.html"), "w", encoding="utf-8") as f:
-        f.write(build_all_page(unique_recent))
-
-    with open(os.path.join(DOCS_DIR, "backlink-feed.xml"), "w", encoding="utf-8") as f:
-        f.write(build_atom_feed(unique_recent))
-
-    with open(os.path.join(DOCS_DIR, "sitemap.xml"), "w", encoding="utf-8") as f:
-        f.write(build_sitemap(dates_sorted))
-
-    with open(os.path.join(DOCS_DIR, "robots.txt"), "w", encoding="utf-8") as f:
-        f.write(build_robots())
-
-    with open(os.path.join(DOCS_DIR, ".nojekyll"), "w", encoding="utf-8") as f:
-        f.write("")
-
-    daily_page_url = f"{BASE_URL}/d/{today}.html"
-    broadcast_indexnow(daily_page_url, DOCS_DIR, BASE_URL)
-
+        for u in by_date.get(d, ()):
+            if u not in seen:
+                seen[u] = None
+    unique_recent = list(seen)
+    top500 = [escape_url(u) for u in unique_recent[:500]]
+    parsed_top100 = [(u, _netloc_path(u)) for u in unique_recent[:100]]
+    recent_dates = dates_sorted[-365:]
+    # Per-day page slice, computed once and shared by digesting, HEAD checks and rendering
+    day_urls = {d: by_date.get(d, [])[:MAX_PER_PAGE] for d in recent_dates}
+
+    # Only days whose URL list changed since the last build get re-checked and rewritten
+    state = load_build_state(BUILD_STATE_FILE)
+    prev_digests = state.get("days", {})
+    day_digests = {}
+    changed_days = []
+    for d in recent_dates:
+        digest = content_digest(d, day_urls[d])
+        day_digests[d] = digest
+        unchanged = prev_digests.get(d) == digest
+        if unchanged and os.path.exists(f"{DAILY_DIR}/{d}.html") and os.path.exists(f"{HEALTH_DIR}/{d}.csv"):
+            continue
+        changed_days.append(d)
+
+    # Site-wide outputs are skipped too when nothing they are rendered from has changed;
+    # the sitemap follows the day digests so a changed day refreshes its lastmod
+    output_digests = {
+        "index.html": content_digest("index.html", dates_sorted[-DAYS_ON_INDEX:], latest_date),
+        "all.html": content_digest("all.html", top500),
+        "backlink-feed.xml": content_digest("backlink-feed.xml", [u for u, _ in parsed_top100]),
+        "sitemap.xml": content_digest("sitemap.xml", day_digests),
+        "robots.txt": content_digest("robots.txt"),
+    }
+    prev_outputs = state.get("outputs", {})
+    stale = {name for name, digest in output_digests.items() if not output_is_current(name, digest, prev_outputs)}
+
+    # What changed is known now, so fire the broadcasts in the background and let
+    # their network round-trips overlap the HEAD checks and writes below
     feed_url = f"{BASE_URL}/backlink-feed.xml"
-    broadcast_pingomatic(feed_url)
+    page_urls = {"index.html": f"{BASE_URL}/", "all.html": f"{BASE_URL}/all.html", "backlink-feed.xml": feed_url}
+    changed_urls = [url for name, url in page_urls.items() if name in stale] + [f"{BASE_URL}/d/{d}.html" for d in changed_days]
+    broadcasts = [threading.Thread(target=broadcast_indexnow, args=(changed_urls, DOCS_DIR, BASE_URL), daemon=True)]
+    if "backlink-feed.xml" in stale:
+        broadcasts.append(threading.Thread(target=broadcast_pingomatic, args=(feed_url,), daemon=True))
+    for t in broadcasts:
+        t.start()
+
+    # The same URL often shows up on many days; HEAD each one once per build,
+    # and not at all if a previous build checked it within HEALTH_TTL_DAYS
+    unique_urls = list(dict.fromkeys(u for d in changed_days for u in day_urls[d]))
+    prev_health = state.get("health", {})
+    health = {}
+    to_check = []
+    for u in unique_urls:
+        entry = prev_health.get(u)
+        if entry and health_is_cacheable(entry) and health_is_fresh(entry[4], now):
+            health[u] = tuple(entry[:4])
+        else:
+            to_check.append(u)
+    checked = run_health_checks(to_check)
+    health.update(checked)
+    checked_utc = now.strftime("%Y-%m-%d %H:%M:%S")
+    window_urls = {u for urls in day_urls.values() for u in urls}
+    health_state = {u: entry for u, entry in prev_health.items() if u in window_urls and health_is_cacheable(entry)}
+    health_state.update((u, [*res, checked_utc]) for u, res in checked.items() if health_is_cacheable(res))
+
+    # Days are independent; render and write them in parallel
+    if changed_days:
+        write_day = functools.partial(_write_day, health=health, updated=updated)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as ex:
+            list(ex.map(write_day, changed_days, [day_urls[d] for d in changed_days]))
+
+    # Independent files: write them concurrently (streamed pages render inside the worker)
+    jobs = []
+    nojekyll = os.path.join(DOCS_DIR, ".nojekyll")
+    if not os.path.exists(nojekyll):
+        jobs.append((write_file, nojekyll, ""))
+    if "index.html" in stale:
+        jobs.append((write_file, os.path.join(DOCS_DIR, "index.html"), build_index_page(dates_sorted, latest_date, updated)))
+    if "all.html" in stale:
+        jobs.append((write_chunks, os.path.join(DOCS_DIR, "all.html"), iter_all_page(top500, updated)))
+    if "backlink-feed.xml" in stale:
+        jobs.append((write_chunks, os.path.join(DOCS_DIR, "backlink-feed.xml"), iter_atom_feed(parsed_top100, updated_iso)))
+    if "sitemap.xml" in stale:
+        jobs.append((write_chunks, os.path.join(DOCS_DIR, "sitemap.xml"), iter_sitemap(recent_dates, today)))
+    if "robots.txt" in stale:
+        jobs.append((write_file, os.path.join(DOCS_DIR, "robots.txt"), build_robots()))
+    if jobs:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(jobs)) as ex:
+            for fut in [ex.submit(*job) for job in jobs]:
+                fut.result()
+
+    state["days"] = day_digests
+    state["health"] = health_state
+    state["outputs"] = output_digests
+    save_build_state(BUILD_STATE_FILE, state)
+
+    for t in broadcasts:
+        t.join(timeout=TIMEOUT)
 
 if __name__ == "__main__":
     main()